@@ -1,23 +1,35 @@
 from django.core.management.base import BaseCommand
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
-from cryptography.hazmat.backends import default_backend
 import os
 
 class Command(BaseCommand):
     help = 'Generate RSA keys for OpenID Connect'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate the keys even if a valid key pair already exists',
+        )
+
     def handle(self, *args, **options):
         # Create keys directory if it doesn't exist
         keys_dir = 'keys'
-        if not os.path.exists(keys_dir):
-            os.makedirs(keys_dir)
+        os.makedirs(keys_dir, exist_ok=True)
+
+        private_key_path = os.path.join(keys_dir, 'private_key.pem')
+        public_key_path = os.path.join(keys_dir, 'public_key.pem')
+
+        # Key generation is slow, so skip it when a usable pair is already on disk
+        if not options['force'] and self._keys_exist(private_key_path, public_key_path):
+            self.stdout.write(f'RSA keys already present in {keys_dir} directory, skipping')
+            return
 
         # Generate private key
         private_key = rsa.generate_private_key(
             public_exponent=65537,
             key_size=2048,
-            backend=default_backend()
         )
 
         # Get private key in PEM format
@@ -34,15 +46,28 @@ class Command(BaseCommand):
             format=serialization.PublicFormat.SubjectPublicKeyInfo
         )
 
-        # Save keys in the keys directory
-        private_key_path = os.path.join(keys_dir, 'private_key.pem')
-        public_key_path = os.path.join(keys_dir, 'public_key.pem')
-
-        with open(private_key_path, 'wb') as f:
-            f.write(private_pem)
-        with open(public_key_path, 'wb') as f:
-            f.write(public_pem)
+        # Save keys in the keys directory, creating the private key owner-only
+        self._write_file(private_key_path, private_pem, 0o600)
+        self._write_file(public_key_path, public_pem, 0o644)
 
         self.stdout.write(
             self.style.SUCCESS(f'Successfully generated RSA keys in {keys_dir} directory')
-        )
\ No newline at end of file
+        )
+
+    def _keys_exist(self, private_key_path, public_key_path):
+        """Return True if both PEM files exist and parse as keys."""
+        try:
+            with open(private_key_path, 'rb') as f:
+                serialization.load_pem_private_key(f.read(), password=None)
+            with open(public_key_path, 'rb') as f:
+                serialization.load_pem_public_key(f.read())
+        except (OSError, ValueError, TypeError):
+            return False
+        return True
+
+    def _write_file(self, path, data, mode):
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, mode)
+        # The open mode only applies to new files; tighten ones left by older runs
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
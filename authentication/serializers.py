@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
 
 User = get_user_model()
 
@@ -9,7 +10,11 @@ class UserSerializer(serializers.ModelSerializer):
     class Meta:
         model = User  
         fields = ['id', 'username', 'password', 'email', 'phone_number', 'address']
-        extra_kwargs = {'password': {'write_only': True}}
+        extra_kwargs = {
+            'password': {'write_only': True},
+            # Uniqueness is enforced by the database constraint in create()
+            'email': {'validators': []},
+        }
 
     def create(self, validated_data):
         """
@@ -17,11 +22,15 @@ class UserSerializer(serializers.ModelSerializer):
         Also assigns a default username if not provided.
         """
         username = validated_data.get('username', validated_data['email'])  # Default username to email if missing
-        user = User.objects.create_user(
-            email=validated_data['email'],
-            username=username,
-            password=validated_data['password'],
-            phone_number=validated_data.get('phone_number', ''),
-            address=validated_data.get('address', '')
-        )
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    email=validated_data['email'],
+                    username=username,
+                    password=validated_data['password'],
+                    phone_number=validated_data.get('phone_number', ''),
+                    address=validated_data.get('address', '')
+                )
+        except IntegrityError:
+            raise serializers.ValidationError({'email': 'A user with that email already exists.'})
         return user
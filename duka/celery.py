@@ -0,0 +1,14 @@
+import os
+
+from celery import Celery
+
+# Set the default Django settings module for the 'celery' program.
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'duka.settings')
+
+app = Celery('duka')
+
+# Read CELERY_* settings from the Django settings module.
+app.config_from_object('django.conf:settings', namespace='CELERY')
+
+# Load tasks.py from every installed app.
+app.autodiscover_tasks()
@@ -0,0 +1,34 @@
+import atexit
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+
+class QueueStreamHandler(QueueHandler):
+    """
+    Log handler that only puts records on an in-memory queue; a background
+    QueueListener thread writes them to stderr, so slow log I/O never blocks
+    request or worker threads.
+
+    The listener is started on first use in each process, which keeps it
+    working in servers that fork workers after loading settings.
+    """
+
+    def __init__(self):
+        super().__init__(queue.SimpleQueue())
+        self._listener = None
+        self._listener_pid = None
+
+    def enqueue(self, record):
+        if self._listener_pid != os.getpid():
+            self._start_listener()
+        super().enqueue(record)
+
+    def _start_listener(self):
+        # A forked child inherits the queue but not the listener thread
+        self.queue = queue.SimpleQueue()
+        self._listener = QueueListener(self.queue, logging.StreamHandler())
+        self._listener.start()
+        self._listener_pid = os.getpid()
+        atexit.register(self._listener.stop)
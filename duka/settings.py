@@ -49,8 +49,6 @@ INSTALLED_APPS = [
     
     # My apps
     'products',
-    'orders',
-    'core',
     'authentication',
 ]
 
@@ -118,6 +116,68 @@ AT_USERNAME = os.getenv('AT_USERNAME')
 AT_API_KEY = os.getenv('AT_API_KEY')
 
 
+# Logging; records are written to stderr from a background thread
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'verbose': {
+            'format': '{asctime} {levelname} {name} {message}',
+            'style': '{',
+        },
+    },
+    'handlers': {
+        'queue': {
+            '()': 'duka.log.QueueStreamHandler',
+            'formatter': 'verbose',
+        },
+    },
+    'root': {
+        'handlers': ['queue'],
+        'level': os.getenv('LOG_LEVEL', 'INFO'),
+    },
+}
+
+
+# Cache (cached counts and aggregates); shared Redis when CACHE_URL is set,
+# otherwise a per-process memory cache so dev and test runs need no Redis
+CACHE_URL = os.getenv('CACHE_URL')
+if CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
+# Celery (background notifications)
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_TASK_ROUTES = {
+    'products.tasks.send_pending_sms_task': {'queue': 'sms'},
+    'products.tasks.send_pending_emails_task': {'queue': 'email'},
+}
+NOTIFICATION_BATCH_INTERVAL = float(os.getenv('NOTIFICATION_BATCH_INTERVAL', 2))
+CELERY_BEAT_SCHEDULE = {
+    'send-pending-sms': {
+        'task': 'products.tasks.send_pending_sms_task',
+        'schedule': NOTIFICATION_BATCH_INTERVAL,
+    },
+    'send-pending-emails': {
+        'task': 'products.tasks.send_pending_emails_task',
+        'schedule': NOTIFICATION_BATCH_INTERVAL,
+    },
+}
+
+
 # Email settings
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = os.environ.get('EMAIL_HOST', 'smtp.gmail.com')  # or a valid SMTP server
@@ -138,7 +198,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -146,6 +205,13 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Templates are parsed once per process and reused, in DEBUG too
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
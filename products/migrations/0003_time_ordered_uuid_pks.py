@@ -0,0 +1,39 @@
+# Generated by Django 5.1.6 on 2026-10-15 18:26
+
+import uuid6
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='category',
+            name='id',
+            field=models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='customer',
+            name='id',
+            field=models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='id',
+            field=models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='id',
+            field=models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='product',
+            name='id',
+            field=models.UUIDField(default=uuid6.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2026-10-15 18:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+CREATE_VIEW_SQL = """
+    CREATE MATERIALIZED VIEW category_product_counts AS
+    SELECT c.id AS category_id, COUNT(pc.product_id) AS cumulative_count
+    FROM products_category c
+    LEFT JOIN products_category d
+        ON d.tree_id = c.tree_id AND d.lft BETWEEN c.lft AND c.rght
+    LEFT JOIN products_product_categories pc ON pc.category_id = d.id
+    GROUP BY c.id;
+    CREATE UNIQUE INDEX category_product_counts_category_id
+        ON category_product_counts (category_id);
+"""
+
+DROP_VIEW_SQL = "DROP MATERIALIZED VIEW IF EXISTS category_product_counts;"
+
+
+def create_view(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_VIEW_SQL)
+
+
+def drop_view(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_VIEW_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0003_time_ordered_uuid_pks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryProductCount',
+            fields=[
+                ('category', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='+', serialize=False, to='products.category')),
+                ('cumulative_count', models.PositiveIntegerField()),
+            ],
+            options={
+                'db_table': 'category_product_counts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_view, drop_view),
+    ]
@@ -0,0 +1,82 @@
+from django.db import migrations
+
+
+ITEM_TOTAL_SQL = """
+    UPDATE products_order SET total_amount = (
+        SELECT COALESCE(SUM(quantity * price_at_time), 0)
+        FROM products_orderitem WHERE order_id = {row}.order_id
+    ) WHERE id = {row}.order_id;
+"""
+
+POSTGRESQL_CREATE_SQL = f"""
+    CREATE FUNCTION products_order_refresh_total() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            {ITEM_TOTAL_SQL.format(row='OLD')}
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            {ITEM_TOTAL_SQL.format(row='NEW')}
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE TRIGGER products_orderitem_total
+        AFTER INSERT OR UPDATE OR DELETE ON products_orderitem
+        FOR EACH ROW EXECUTE FUNCTION products_order_refresh_total();
+"""
+
+POSTGRESQL_DROP_SQL = """
+    DROP TRIGGER IF EXISTS products_orderitem_total ON products_orderitem;
+    DROP FUNCTION IF EXISTS products_order_refresh_total();
+"""
+
+SQLITE_CREATE_SQL = [
+    f"""
+    CREATE TRIGGER products_orderitem_total_insert AFTER INSERT ON products_orderitem
+    BEGIN {ITEM_TOTAL_SQL.format(row='NEW')} END;
+    """,
+    f"""
+    CREATE TRIGGER products_orderitem_total_update AFTER UPDATE ON products_orderitem
+    BEGIN {ITEM_TOTAL_SQL.format(row='OLD')} {ITEM_TOTAL_SQL.format(row='NEW')} END;
+    """,
+    f"""
+    CREATE TRIGGER products_orderitem_total_delete AFTER DELETE ON products_orderitem
+    BEGIN {ITEM_TOTAL_SQL.format(row='OLD')} END;
+    """,
+]
+
+SQLITE_DROP_SQL = [
+    "DROP TRIGGER IF EXISTS products_orderitem_total_insert;",
+    "DROP TRIGGER IF EXISTS products_orderitem_total_update;",
+    "DROP TRIGGER IF EXISTS products_orderitem_total_delete;",
+]
+
+
+def create_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRESQL_CREATE_SQL)
+    elif vendor == 'sqlite':
+        for sql in SQLITE_CREATE_SQL:
+            schema_editor.execute(sql)
+
+
+def drop_triggers(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRESQL_DROP_SQL)
+    elif vendor == 'sqlite':
+        for sql in SQLITE_DROP_SQL:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0004_category_product_counts_view'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_triggers, drop_triggers),
+    ]
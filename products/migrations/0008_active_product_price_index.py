@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-15 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0007_cursor_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['id', 'price'], name='prod_active_price_idx'),
+        ),
+    ]
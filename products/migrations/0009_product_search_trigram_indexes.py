@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-15 18:40
+
+from django.db import migrations
+
+
+# SearchFilter's icontains lookups compile to UPPER(column) LIKE
+# UPPER('%term%') on PostgreSQL (with a ::text cast for varchar columns), so
+# the trigram indexes are built on that exact expression for the planner to
+# use them. B-tree indexes can't serve a leading-wildcard LIKE at all.
+CREATE_INDEXES_SQL = """
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX IF NOT EXISTS prod_name_trgm_idx
+        ON products_product USING gin ((UPPER(name::text)) gin_trgm_ops);
+    CREATE INDEX IF NOT EXISTS prod_description_trgm_idx
+        ON products_product USING gin ((UPPER(description)) gin_trgm_ops);
+"""
+
+DROP_INDEXES_SQL = """
+    DROP INDEX IF EXISTS prod_name_trgm_idx;
+    DROP INDEX IF EXISTS prod_description_trgm_idx;
+"""
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_INDEXES_SQL)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_INDEXES_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_active_product_price_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
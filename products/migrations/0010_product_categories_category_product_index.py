@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-15 18:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_product_search_trigram_indexes'),
+    ]
+
+    # The categories table is auto-created by the many-to-many field, so its
+    # index is managed here instead of on a model. Category filters read the
+    # product ids from the index without visiting the table.
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX products_product_categories_cat_prod_idx "
+            "ON products_product_categories (category_id, product_id);",
+            "DROP INDEX products_product_categories_cat_prod_idx;",
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-15 19:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_categories_category_product_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ordernotification',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='ordernotification',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='When a pending row may next be sent, or a sending row reclaimed'),
+        ),
+        migrations.AlterField(
+            model_name='ordernotification',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('SENDING', 'Sending'), ('SENT', 'Sent'), ('FAILED', 'Failed')], default='PENDING', max_length=10),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-15 19:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_order_notification_attempts'),
+    ]
+
+    # The (created_at, id) index added in 0007 covers every lookup this one served
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='products_pr_created_52f0d7_idx',
+        ),
+    ]
@@ -1,11 +1,42 @@
-import uuid
+import time
 from decimal import Decimal
+from uuid6 import uuid7
+from django.core.cache import cache
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.conf import settings
+from django.utils import timezone
 from django.core.exceptions import ValidationError
 from mptt.models import MPTTModel, TreeForeignKey
 
+CATEGORY_AVERAGES_VERSION_KEY = 'catavg:version'
+CATEGORY_AVERAGE_TTL = 60
+
+
+def cache_version(key):
+    """Return the current value of a cache version counter, starting it if unset."""
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so a counter lost to eviction never reuses
+        # a version that older cached entries were stored under.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(key):
+    """Invalidate every entry keyed on the given version counter."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def category_average_key(category_id):
+    """Cache key for a category's average price, dropped on any product change."""
+    return f"cat_avg:{cache_version(CATEGORY_AVERAGES_VERSION_KEY)}:{category_id}"
+
+
 class TimestampedModel(models.Model):
     """Abstract base class with timestamp fields."""
     created_at = models.DateTimeField(auto_now_add=True)
@@ -16,7 +47,7 @@ class TimestampedModel(models.Model):
 
 class Category(MPTTModel, TimestampedModel):
     """Hierarchical category model for products."""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     name = models.CharField(max_length=200, unique=True)
     description = models.TextField(blank=True)
     parent = TreeForeignKey(
@@ -32,6 +63,9 @@ class Category(MPTTModel, TimestampedModel):
     class Meta:
         verbose_name_plural = "categories"
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['tree_id', 'lft', 'is_active'], name='cat_tree_lft_active_idx'),
+        ]
 
     class MPTTMeta:
         order_insertion_by = ["name"]
@@ -43,9 +77,27 @@ class Category(MPTTModel, TimestampedModel):
         """Returns total number of products in this category and its subcategories."""
         return Product.objects.filter(categories__in=self.get_descendants(include_self=True)).count()
 
+class CategoryProductCount(models.Model):
+    """
+    Cumulative product count per category, read from the
+    ``category_product_counts`` materialized view (PostgreSQL only).
+    """
+    category = models.OneToOneField(
+        Category,
+        primary_key=True,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name="+"
+    )
+    cumulative_count = models.PositiveIntegerField()
+
+    class Meta:
+        managed = False
+        db_table = 'category_product_counts'
+
 class Customer(TimestampedModel):
     """Customer model extending the User model."""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -67,8 +119,8 @@ class Customer(TimestampedModel):
 
 class Product(TimestampedModel):
     """Product model with category relationship."""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
-    name = models.CharField(max_length=255, db_index=True)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    name = models.CharField(max_length=255)
     description = models.TextField(blank=True)
     price = models.DecimalField(
         max_digits=10,
@@ -85,9 +137,25 @@ class Product(TimestampedModel):
 
     class Meta:
         ordering = ['name']
+        # Trigram indexes for name/description search are PostgreSQL-only and
+        # created in migration 0009 rather than declared here.
         indexes = [
             models.Index(fields=['name']),
-            models.Index(fields=['created_at']),
+            models.Index(
+                fields=['is_active', 'name'],
+                condition=models.Q(is_active=True),
+                name='prod_active_name_idx'
+            ),
+            models.Index(fields=['is_active', '-created_at']),
+            models.Index(fields=['created_at', 'id']),
+            # Category filters reach products by pk through the categories
+            # table; with price in the key the AVG(price) in category_average
+            # can be answered from the index alone.
+            models.Index(
+                fields=['id', 'price'],
+                condition=models.Q(is_active=True),
+                name='prod_active_price_idx'
+            ),
         ]
 
     def __str__(self):
@@ -100,15 +168,6 @@ class Product(TimestampedModel):
         if self.stock < 0:
             raise ValidationError('Stock cannot be negative')
 
-    def save(self, *args, **kwargs):
-        if not self.pk:  # Only reduce stock on first save
-            if self.product.stock < self.quantity:
-             raise ValidationError(f"Not enough stock for {self.product.name}")
-            self.product.stock -= self.quantity
-            self.product.save()
-        super().save(*args, **kwargs)
-        self.order.calculate_total()
-
     def is_in_stock(self):
         """Check if product is in stock."""
         return self.stock > 0
@@ -121,7 +180,7 @@ class Order(TimestampedModel):
         COMPLETED = 'COMPLETED', 'Completed'
         CANCELLED = 'CANCELLED', 'Cancelled'
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     customer = models.ForeignKey(
         Customer,
         on_delete=models.CASCADE,
@@ -141,22 +200,17 @@ class Order(TimestampedModel):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['customer', '-created_at']),
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"Order {self.id} by {self.customer}"
 
-    def calculate_total(self):
-        """Calculate total amount for the order and save it."""
-        total = sum(
-            item.get_subtotal() for item in self.order_items.all()
-        )
-        if self.total_amount != total:
-            self.total_amount = total
-            self.save()
-
 class OrderItem(TimestampedModel):
     """Individual items within an order."""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     order = models.ForeignKey(
         Order,
         on_delete=models.CASCADE,
@@ -185,10 +239,49 @@ class OrderItem(TimestampedModel):
 
     def save(self, *args, **kwargs):
         self.price_at_time = self.product.price  # Always store price history
+        # Order.total_amount is kept in step by database triggers
         super().save(*args, **kwargs)
-        # Update order total
-        self.order.calculate_total()
 
     def get_subtotal(self):
         """Calculate subtotal for this order item."""
         return self.quantity * self.price_at_time
+
+class OrderNotification(TimestampedModel):
+    """Outbox row for an order notification, sent later in a batch with others."""
+    class Channel(models.TextChoices):
+        SMS = 'SMS', 'SMS'
+        EMAIL = 'EMAIL', 'Email'
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        SENDING = 'SENDING', 'Sending'
+        SENT = 'SENT', 'Sent'
+        FAILED = 'FAILED', 'Failed'
+
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        related_name="notifications"
+    )
+    channel = models.CharField(max_length=10, choices=Channel.choices)
+    payload = models.JSONField(help_text="Provider arguments for this message")
+    status = models.CharField(
+        max_length=10,
+        choices=Status.choices,
+        default=Status.PENDING
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        help_text="When a pending row may next be sent, or a sending row reclaimed"
+    )
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'channel', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} notification for Order {self.order_id} ({self.status})"
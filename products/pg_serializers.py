@@ -0,0 +1,104 @@
+"""
+PostgreSQL-side JSON rendering for hot list endpoints.
+
+The JSON is assembled by the database with json_build_object/json_agg and
+returned as a single string, so no model instances or serializer fields are
+created in Python. The shape mirrors OrderSerializer.
+"""
+import json
+from typing import Any, Dict, List
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from .models import Customer, Order, OrderItem, Product
+
+
+def _timestamp(column: str) -> str:
+    """Format a timestamptz column the way DRF's DateTimeField does."""
+    return f"""to_char({column} AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"')"""
+
+
+def _order_items_sql(tables: Dict[str, str]) -> str:
+    """The order_items entry of an order's json_build_object, with its comma."""
+    return f"""
+            'order_items', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', oi.id,
+                    'product', p.name,
+                    'quantity', oi.quantity,
+                    'price_at_time', oi.price_at_time::text,
+                    'subtotal', (oi.quantity * oi.price_at_time)::numeric(10, 2)::text,
+                    'created_at', {_timestamp('oi.created_at')},
+                    'updated_at', {_timestamp('oi.updated_at')}
+                ) ORDER BY oi.created_at)
+                FROM {tables['item']} oi
+                JOIN {tables['product']} p ON p.id = oi.product_id
+                WHERE oi.order_id = o.id
+            ), '[]'::json),"""
+
+
+def _order_list_sql(items: bool) -> str:
+    tables = {
+        'order': Order._meta.db_table,
+        'customer': Customer._meta.db_table,
+        'user': get_user_model()._meta.db_table,
+        'item': OrderItem._meta.db_table,
+        'product': Product._meta.db_table,
+    }
+    items_json = _order_items_sql(tables) if items else ''
+    return f"""
+        SELECT COALESCE(json_agg(json_build_object(
+            'id', o.id,
+            'customer', json_build_object(
+                'id', c.id,
+                'user', json_build_object(
+                    'id', u.id,
+                    'username', u.username,
+                    'email', u.email,
+                    'first_name', u.first_name,
+                    'last_name', u.last_name
+                ),
+                'phone_number', c.phone_number,
+                'address', c.address,
+                'created_at', {_timestamp('c.created_at')},
+                'updated_at', {_timestamp('c.updated_at')},
+                'total_orders', (
+                    SELECT COUNT(*) FROM {tables['order']} co WHERE co.customer_id = c.id
+                ),
+                'is_active', c.is_active
+            ),{items_json}
+            'status', o.status,
+            'total_amount', o.total_amount::text,
+            'notes', o.notes,
+            'created_at', {_timestamp('o.created_at')},
+            'updated_at', {_timestamp('o.updated_at')}
+        ) ORDER BY page.position), '[]'::json)::text
+        FROM unnest(%s::uuid[]) WITH ORDINALITY AS page(id, position)
+        JOIN {tables['order']} o ON o.id = page.id
+        JOIN {tables['customer']} c ON c.id = o.customer_id
+        JOIN {tables['user']} u ON u.id = c.user_id
+    """
+
+
+def is_supported() -> bool:
+    """JSON rendering in SQL relies on PostgreSQL's JSON functions."""
+    return connection.vendor == 'postgresql'
+
+
+def render_orders(order_ids: List[Any], items: bool = True) -> str:
+    """
+    Return the JSON array for the given orders, in the order given; with
+    ``items=False`` the order_items key is left out, as in OrderSerializer.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(_order_list_sql(items), [[str(pk) for pk in order_ids]])
+        return cursor.fetchone()[0]
+
+
+def paginated_json(paginator: Any, results: str) -> str:
+    """Wrap an already-encoded results array in the paginator's envelope."""
+    envelope = dict(paginator.get_paginated_response([]).data)
+    envelope.pop('results')
+    head = json.dumps(envelope, cls=DjangoJSONEncoder)[:-1]
+    separator = ', ' if envelope else ''
+    return f'{head}{separator}"results": {results}}}'
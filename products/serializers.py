@@ -1,8 +1,71 @@
+import operator
+from collections import Counter
 from rest_framework import serializers
-from django.contrib.auth.models import User
-from .models import Customer, Category, Product, Order, OrderItem
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, OuterRef, Prefetch, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from .models import Customer, Category, CategoryProductCount, Product, Order, OrderItem
 from decimal import Decimal
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set
+
+User = get_user_model()
+
+
+def optimize_customer_queryset(queryset: QuerySet) -> QuerySet:
+    """
+    Prepare a Customer queryset for CustomerSerializer: join the user row
+    and annotate the order count read by ``get_total_orders``.
+    """
+    return queryset.select_related('user').annotate(_total_orders=Count('orders'))
+
+
+def optimize_order_queryset(queryset: QuerySet, items: bool = True) -> QuerySet:
+    """
+    Prepare an Order queryset for OrderSerializer so that customers, users,
+    order items and their products load in a constant number of queries.
+    Pass ``items=False`` when the order items won't be serialized.
+    """
+    queryset = queryset.prefetch_related(
+        Prefetch('customer', queryset=optimize_customer_queryset(Customer.objects.all()))
+    )
+    if items:
+        queryset = queryset.prefetch_related(Prefetch(
+            'order_items',
+            queryset=OrderItem.objects.select_related('product').only(
+                'id', 'order_id', 'quantity', 'price_at_time', 'created_at',
+                'updated_at', 'product__id', 'product__name'
+            )
+        ))
+    return queryset
+
+
+def requested_expansions(request: Any) -> Set[str]:
+    """Names listed in the request's ``?expand=`` parameter, e.g. ``items,category``."""
+    if request is None:
+        return set()
+    return {name.strip() for name in request.query_params.get('expand', '').split(',') if name.strip()}
+
+def projected_fields(serializer_class: type, prefix: str = '') -> List[str]:
+    """
+    Concrete columns read by ``serializer_class.Meta.fields``, for use with
+    ``QuerySet.only()``. Nested model serializers over a forward relation
+    are followed, so a ``select_related`` table is narrowed as well.
+    """
+    meta = serializer_class.Meta
+    concrete = {field.name for field in meta.model._meta.concrete_fields}
+    columns = []
+    for name in meta.fields:
+        field = serializer_class._declared_fields.get(name)
+        if field is not None and field.write_only:
+            continue
+        source = getattr(field, 'source', None) or name
+        if source not in concrete:
+            continue
+        columns.append(prefix + source)
+        if isinstance(field, serializers.ModelSerializer):
+            columns.extend(projected_fields(type(field), f'{prefix}{source}__'))
+    return columns
 
 class TimestampedSerializer(serializers.ModelSerializer):
     """
@@ -12,17 +75,71 @@ class TimestampedSerializer(serializers.ModelSerializer):
     created_at = serializers.DateTimeField(read_only=True)
     updated_at = serializers.DateTimeField(read_only=True)
 
+class StaticTemplateMixin:
+    """
+    Read-path shortcut for flat serializers on hot list endpoints.
+
+    On first use the readable fields are compiled, once per class, into a
+    tuple of ``(name, getter, to_representation)``; every row after that is
+    a tight loop over the tuple instead of DRF's per-field ``get_attribute``
+    walk. The template is taken from a fresh, context-free instance so the
+    class never holds on to a request's serializer tree. Only use it where
+    each field is a plain (possibly dotted) attribute or method lookup that
+    needs no serializer context.
+    """
+
+    def to_representation(self, instance: Any) -> Dict[str, Any]:
+        template = type(self).__dict__.get('_template')
+        if template is None:
+            template = tuple(
+                (name, self._attribute_getter(field.source_attrs), field.to_representation)
+                for name, field in type(self)().fields.items()
+                if not field.write_only
+            )
+            type(self)._template = template
+
+        ret = {}
+        for name, getter, to_representation in template:
+            value = getter(instance)
+            ret[name] = None if value is None else to_representation(value)
+        return ret
+
+    @staticmethod
+    def _attribute_getter(source_attrs: List[str]) -> Callable[[Any], Any]:
+        getter = operator.attrgetter('.'.join(source_attrs))
+
+        def get(instance: Any) -> Any:
+            value = getter(instance)
+            return value() if callable(value) else value
+        return get
+
+class ExpandableFieldsMixin:
+    """
+    Leaves heavy nested fields out of list responses unless the client asks
+    for them with ``?expand=``. ``Meta.expandable_fields`` maps each expand
+    name to the field it gates. Every other action, serializing without a
+    view, and schema generation keep every field.
+    """
+
+    def get_fields(self) -> Dict[str, serializers.Field]:
+        fields = super().get_fields()
+        view = self.context.get('view')
+        if getattr(view, 'action', None) == 'list' and not getattr(view, 'swagger_fake_view', False):
+            expand = requested_expansions(self.context.get('request'))
+            for name, field_name in self.Meta.expandable_fields.items():
+                if name not in expand:
+                    fields.pop(field_name, None)
+        return fields
+
 class StockUpdateSerializer(serializers.Serializer):
     """
     Serializer for updating product stock.
     """
-    class Meta:
-        model = Product
-        fields = ['id','stock']
+    stock = serializers.IntegerField(min_value=0)
 
 class UserSerializer(serializers.ModelSerializer):
     """
-    Serializer for User model with additional validation.
+    Serializer for User model; email uniqueness is enforced by the database.
     """
     email = serializers.EmailField(required=True)
     
@@ -30,16 +147,6 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'email', 'first_name', 'last_name']
         read_only_fields = ['id']
-        
-    def validate_email(self, value: str) -> str:
-        """
-        Validate email uniqueness.
-        """
-        if self.instance and self.instance.email == value:
-         return value  # Allow unchanged email
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError("This email is already in use.")
-        return value
 
 class CustomerSerializer(TimestampedSerializer):
     """
@@ -58,17 +165,94 @@ class CustomerSerializer(TimestampedSerializer):
         """
         Get total number of orders for the customer.
         """
-        return obj.orders.count()
+        total_orders = getattr(obj, '_total_orders', None)
+        if total_orders is None:
+            total_orders = obj.get_total_orders()
+        return total_orders
 
     def create(self, validated_data: Dict[str, Any]) -> Customer:
         """
         Create customer with nested user data.
         """
         user_data = validated_data.pop('user')
-        user = User.objects.create_user(**user_data)
+        # Email uniqueness is left to the database constraint rather than
+        # checked with an extra query beforehand.
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(**user_data)
+        except IntegrityError:
+            raise serializers.ValidationError({'user': {'email': "This email is already in use."}})
         customer = Customer.objects.create(user=user, **validated_data)
         return customer
 
+class CategoryIndex:
+    """
+    In-memory index of one or more MPTT category trees.
+
+    Every category of each tree is fetched with a single query, annotated
+    with the number of products in it and its descendants, so serializing a
+    tree costs one query regardless of its size. On PostgreSQL the counts
+    come from the ``category_product_counts`` materialized view; elsewhere
+    MPTT's ``add_related_count`` computes them inline.
+    """
+
+    def __init__(self, tree_ids: Iterable[int]):
+        self.tree_ids = set(tree_ids)
+        queryset = Category.objects.filter(tree_id__in=self.tree_ids)
+        if connection.vendor == 'postgresql':
+            queryset = queryset.annotate(products_count=Coalesce(
+                Subquery(CategoryProductCount.objects.filter(
+                    category_id=OuterRef('pk')
+                ).values('cumulative_count')),
+                0
+            ))
+        else:
+            queryset = Category.objects.add_related_count(
+                queryset, Product, 'categories', 'products_count', cumulative=True
+            )
+        self.rows = list(
+            queryset.order_by('tree_id', 'lft')
+            .values('id', 'name', 'description', 'parent_id', 'is_active',
+                    'created_at', 'updated_at', 'lft', 'rght', 'level', 'tree_id',
+                    'products_count')
+        )
+        self.rows_by_id: Dict[Any, Dict[str, Any]] = {row['id']: row for row in self.rows}
+        self._nodes: Optional[Dict[Any, Dict[str, Any]]] = None
+
+    def products_count(self, pk: Any) -> int:
+        return self.rows_by_id[pk]['products_count']
+
+    def nodes(self, serialize_row: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Dict[Any, Dict[str, Any]]:
+        """
+        Output dicts for every category keyed by id, with active children
+        already attached to their parent's ``subcategories`` list.
+
+        Built once per index in a single forward pass: lft order guarantees
+        a parent's node exists before any of its children are visited.
+        """
+        if self._nodes is None:
+            nodes = {}
+            for row in self.rows:
+                node = nodes[row['id']] = serialize_row(row)
+                parent = nodes.get(row['parent_id'])
+                if parent is not None and row['is_active']:
+                    parent['subcategories'].append(node)
+            self._nodes = nodes
+        return self._nodes
+
+
+class CategoryListSerializer(serializers.ListSerializer):
+    """
+    Builds the category index for every tree on the page up front so each
+    child serializer reads subcategories and counts from memory.
+    """
+
+    def to_representation(self, data: Any) -> List[Dict[str, Any]]:
+        categories = list(data.all() if hasattr(data, 'all') else data)
+        self.child.get_category_index({category.tree_id for category in categories})
+        return super().to_representation(categories)
+
+
 class CategorySerializer(TimestampedSerializer):
     """
     Recursive serializer for hierarchical category structure.
@@ -81,21 +265,80 @@ class CategorySerializer(TimestampedSerializer):
         fields = ['id', 'name', 'description', 'parent', 'subcategories', 
                  'products_count', 'is_active', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = CategoryListSerializer
+
+    def get_category_index(self, tree_ids: Iterable[int]) -> CategoryIndex:
+        """
+        Return a category index covering ``tree_ids``, reusing the one
+        already built for this serializer where possible.
+        """
+        tree_ids = set(tree_ids)
+        index = getattr(self, '_category_index', None)
+        if index is None or not tree_ids <= index.tree_ids:
+            # Keep the trees already indexed so alternating callers don't rebuild it
+            if index is not None:
+                tree_ids |= index.tree_ids
+            index = CategoryIndex(tree_ids)
+            self._category_index = index
+        return index
+
+    def represent_rows(self, rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Serialize categories given as ``values('id', 'tree_id')`` rows,
+        straight from the category index without instantiating models.
+        """
+        rows = list(rows)
+        index = self.get_category_index({row['tree_id'] for row in rows})
+        nodes = index.nodes(self._serialize_row)
+        return [nodes[row['id']] for row in rows]
 
     def get_subcategories(self, obj: Category) -> List[Dict[str, Any]]:
         """
-        Recursively serialize child categories.
+        Serialize active child categories from the in-memory tree.
         """
-        return CategorySerializer(obj.children.filter(is_active=True), 
-                                many=True).data
+        index = self.get_category_index([obj.tree_id])
+        return index.nodes(self._serialize_row)[obj.pk]['subcategories']
 
     def get_products_count(self, obj: Category) -> int:
         """
         Get total number of products in category and subcategories.
         """
-        return obj.get_products_count()
+        products_count = getattr(obj, 'products_count', None)
+        if products_count is None:
+            products_count = self.get_category_index([obj.tree_id]).products_count(obj.pk)
+        return products_count
+
+    def _serialize_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        fields = self.fields
+        return {
+            'id': fields['id'].to_representation(row['id']),
+            'name': row['name'],
+            'description': row['description'],
+            'parent': row['parent_id'],
+            'subcategories': [],
+            'products_count': row['products_count'],
+            'is_active': row['is_active'],
+            'created_at': fields['created_at'].to_representation(row['created_at']),
+            'updated_at': fields['updated_at'].to_representation(row['updated_at']),
+        }
 
-class ProductSerializer(TimestampedSerializer):
+class ProductCategoriesListSerializer(serializers.ListSerializer):
+    """
+    Builds one category index for every tree on the page up front, so the
+    nested categories of all products are serialized from memory.
+    """
+
+    def to_representation(self, data: Any) -> List[Dict[str, Any]]:
+        products = list(data.all() if hasattr(data, 'all') else data)
+        categories = self.child.fields.get('categories')
+        if categories is not None:
+            categories.child.get_category_index({
+                category.tree_id for product in products for category in product.categories.all()
+            })
+        return super().to_representation(products)
+
+
+class ProductSerializer(ExpandableFieldsMixin, TimestampedSerializer):
     """
     Product serializer with category details and stock information.
     """
@@ -114,6 +357,8 @@ class ProductSerializer(TimestampedSerializer):
                  'category_ids', 'stock', 'in_stock', 'is_active', 
                  'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+        expandable_fields = {'category': 'categories'}
+        list_serializer_class = ProductCategoriesListSerializer
 
     def validate_price(self, value: Decimal) -> Decimal:
         """
@@ -123,7 +368,20 @@ class ProductSerializer(TimestampedSerializer):
             raise serializers.ValidationError("Price must be greater than zero.")
         return value
 
-class OrderItemSerializer(TimestampedSerializer):
+class ProductListSerializer(StaticTemplateMixin, TimestampedSerializer):
+    """
+    Flat product serializer for list endpoints; leaves out the nested
+    categories so each row is built from primitive fields only.
+    """
+    in_stock = serializers.BooleanField(source='is_in_stock', read_only=True)
+
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'price', 'stock', 'in_stock', 'is_active',
+                 'created_at', 'updated_at']
+        read_only_fields = fields
+
+class OrderItemSerializer(StaticTemplateMixin, TimestampedSerializer):
     """
     Serializer for order items with product details and subtotal calculation.
     """
@@ -167,7 +425,7 @@ class OrderItemSerializer(TimestampedSerializer):
             )
         return data
 
-class OrderSerializer(TimestampedSerializer):
+class OrderSerializer(ExpandableFieldsMixin, TimestampedSerializer):
     """
     Order serializer with nested customer and order items.
     """
@@ -190,28 +448,42 @@ class OrderSerializer(TimestampedSerializer):
         fields = ['id', 'customer', 'customer_id', 'order_items', 'items_data',
                  'status', 'total_amount', 'notes', 'created_at', 'updated_at']
         read_only_fields = ['id', 'total_amount', 'created_at', 'updated_at']
+        expandable_fields = {'items': 'order_items'}
 
     def create(self, validated_data: Dict[str, Any]) -> Order:
         """
         Create order with nested order items.
         """
         items_data = validated_data.pop('order_items')
-        # Check stock availability before creating order
-        for item in items_data:
-            product, quantity = item['product'], item['quantity']
-            if product.stock < quantity:
-                raise serializers.ValidationError(
-                    f"Insufficient stock for {product.name} ({product.stock} available)."
-                )
-
-        order = Order.objects.create(**validated_data)
-        for item_data in items_data:
-            product = item_data['product']
-            product.stock -= item_data['quantity']
-            product.save()
-            OrderItem.objects.create(order=order, **item_data)
-
-        order.calculate_total()
+        with transaction.atomic():
+            order = Order.objects.create(**validated_data)
+
+            # Lock every product on the order with one query, check the
+            # summed quantities against it, then decrement each product once.
+            quantities = Counter()
+            for item in items_data:
+                quantities[item['product'].pk] += item['quantity']
+            products = {
+                product.pk: product
+                for product in Product.objects.select_for_update()
+                .filter(pk__in=quantities).only('id', 'stock', 'name')
+            }
+            for product_id, quantity in quantities.items():
+                product = products[product_id]
+                if product.stock < quantity:
+                    raise serializers.ValidationError(
+                        f"Insufficient stock for {product.name} ({product.stock} available)."
+                    )
+            for product_id, quantity in quantities.items():
+                Product.objects.filter(pk=product_id).update(stock=F('stock') - quantity)
+
+            # bulk_create skips OrderItem.save, so record the price here; the
+            # order total is maintained by a database trigger on insert.
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, price_at_time=item_data['product'].price, **item_data)
+                for item_data in items_data
+            ])
+        order.refresh_from_db(fields=['total_amount'])
         return order
 
     def validate_items_data(self, value: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -1,33 +1,183 @@
-import os
-from django.core.mail import send_mail
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from functools import lru_cache
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
 import africastalking
+from .models import OrderNotification
 
-def send_order_sms(order):
-    username = os.environ.get('AT_USERNAME')
-    api_key = os.environ.get('AT_API_KEY')
-    
-    africastalking.initialize(username, api_key)
-    sms = africastalking.SMS
-    
-    message = f"Your order #{order.id} has been received and is being processed."
-    recipients = [order.customer.phone_number]
-    
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_BATCH_SIZE = 200
+NOTIFICATION_MAX_ATTEMPTS = 5
+NOTIFICATION_RETRY_DELAY = timedelta(minutes=1)
+NOTIFICATION_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+@lru_cache(maxsize=1)
+def get_sms_client():
+    """
+    Initialise the Africa's Talking SDK once per process and return its SMS
+    service. Lazy rather than at import so the module loads without credentials.
+    """
+    africastalking.initialize(settings.AT_USERNAME, settings.AT_API_KEY)
+    return africastalking.SMS
+
+
+# Every order gets the same confirmation text, so a whole batch of them goes
+# out in one Africa's Talking call; a per-order detail such as the order id
+# would split the batch into one call per order.
+ORDER_SMS_MESSAGE = "Your order has been received and is being processed."
+
+def order_sms_payload(order):
+    return {
+        'message': ORDER_SMS_MESSAGE,
+        'recipient': order.customer.phone_number,
+    }
+
+def admin_email_payload(order):
+    # The items are fetched once here so the template loop runs on a list
+    items = list(order.order_items.select_related('product'))
+    return {
+        'subject': f'New Order #{order.id}',
+        'message': render_to_string('emails/new_order.txt', {'order': order, 'items': items}),
+        'from_email': settings.DEFAULT_FROM_EMAIL,
+        'recipient_list': [settings.ADMIN_EMAIL],
+    }
+
+def queue_order_notifications(order):
+    """
+    Store the order's SMS and admin email for the next batch send. The email
+    is skipped when no ADMIN_EMAIL is configured, as it could never be sent.
+    """
+    notifications = [
+        OrderNotification(order=order, channel=OrderNotification.Channel.SMS,
+                          payload=order_sms_payload(order)),
+    ]
+    if settings.ADMIN_EMAIL:
+        notifications.append(
+            OrderNotification(order=order, channel=OrderNotification.Channel.EMAIL,
+                              payload=admin_email_payload(order))
+        )
+    OrderNotification.objects.bulk_create(notifications)
+
+def send_sms_batch(notifications):
+    """
+    Send one API call per distinct message, covering all of its recipients.
+    Returns the notifications whose call failed.
+    """
+    groups = defaultdict(list)
+    for notification in notifications:
+        groups[notification.payload['message']].append(notification)
+    sms = get_sms_client()
+    failed = []
+    for message, group in groups.items():
+        try:
+            sms.send(message, [notification.payload['recipient'] for notification in group])
+        except Exception:
+            logger.exception("Sending SMS to %d recipients failed", len(group))
+            failed.extend(group)
+    return failed
+
+def send_email_batch(notifications):
+    """
+    Send every email over one SMTP session, closed even if a send fails.
+    Returns the notifications that could not be sent.
+    """
+    failed = []
+    with get_connection() as connection:
+        for notification in notifications:
+            payload = notification.payload
+            try:
+                # send() returns 0 instead of raising when nothing was sent
+                if not EmailMessage(
+                    payload['subject'], payload['message'], payload['from_email'],
+                    payload['recipient_list'], connection=connection
+                ).send():
+                    raise ValueError("no recipients")
+            except Exception:
+                logger.exception("Sending email notification %s failed", notification.pk)
+                failed.append(notification)
+    return failed
+
+
+BATCH_SENDERS = {
+    OrderNotification.Channel.SMS: send_sms_batch,
+    OrderNotification.Channel.EMAIL: send_email_batch,
+}
+
+def claim_notifications(channel, limit=NOTIFICATION_BATCH_SIZE):
+    """
+    Mark up to ``limit`` due notifications for ``channel`` as SENDING and
+    return them.
+
+    The claim is committed before anything is sent, so no row locks are held
+    during provider calls and concurrent workers pick up different rows.
+    Rows left SENDING by a worker that died are reclaimed once their
+    NOTIFICATION_CLAIM_TIMEOUT has passed.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        notifications = list(
+            OrderNotification.objects.select_for_update(skip_locked=True)
+            .filter(
+                channel=channel,
+                status__in=[OrderNotification.Status.PENDING, OrderNotification.Status.SENDING],
+                next_attempt_at__lte=now,
+            )
+            .order_by('created_at')[:limit]
+        )
+        if notifications:
+            OrderNotification.objects.filter(
+                pk__in=[notification.pk for notification in notifications]
+            ).update(
+                status=OrderNotification.Status.SENDING,
+                attempts=F('attempts') + 1,
+                next_attempt_at=now + NOTIFICATION_CLAIM_TIMEOUT,
+                updated_at=now,
+            )
+    for notification in notifications:
+        notification.attempts += 1
+    return notifications
+
+def send_pending_notifications(channel, limit=NOTIFICATION_BATCH_SIZE):
+    """
+    Send up to ``limit`` pending notifications for ``channel`` in one batch.
+
+    Status is recorded per message: sent rows become SENT, failed ones go
+    back to PENDING for another try after NOTIFICATION_RETRY_DELAY, and rows
+    that have used up NOTIFICATION_MAX_ATTEMPTS become FAILED. Returns the
+    number of notifications processed.
+    """
+    notifications = claim_notifications(channel, limit)
+    if not notifications:
+        return 0
     try:
-        response = sms.send(message, recipients)
-        return response
-    except Exception as e:
-        print(f"Error sending SMS: {str(e)}")
-
-def send_admin_email(order):
-    subject = f'New Order #{order.id}'
-    message = f"""
-    Order Details:
-    Customer: {order.customer.user.get_full_name()}
-    Total Amount: ${order.total_amount}
-    Items:
-    {format_order_items(order)}
-    """
-    from_email = os.environ.get('EMAIL_FROM')
-    admin_email = os.environ.get('ADMIN_EMAIL')
-    
-    send_mail(subject, message, from_email, [admin_email])
+        failed = BATCH_SENDERS[channel](notifications)
+    except Exception:
+        # Nothing went out, e.g. the SMS client or SMTP connection failed
+        logger.exception("Sending %d %s notifications failed", len(notifications), channel)
+        failed = notifications
+
+    now = timezone.now()
+    failed_ids = {notification.pk for notification in failed}
+    OrderNotification.objects.filter(
+        pk__in=[notification.pk for notification in notifications if notification.pk not in failed_ids]
+    ).update(status=OrderNotification.Status.SENT, updated_at=now)
+    retry_ids = [
+        notification.pk for notification in failed
+        if notification.attempts < NOTIFICATION_MAX_ATTEMPTS
+    ]
+    OrderNotification.objects.filter(pk__in=retry_ids).update(
+        status=OrderNotification.Status.PENDING,
+        next_attempt_at=now + NOTIFICATION_RETRY_DELAY,
+        updated_at=now,
+    )
+    OrderNotification.objects.filter(pk__in=failed_ids.difference(retry_ids)).update(
+        status=OrderNotification.Status.FAILED, updated_at=now
+    )
+    return len(notifications)
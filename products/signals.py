@@ -0,0 +1,35 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .models import (
+    CATEGORY_AVERAGES_VERSION_KEY, Category, Product, bump_cache_version
+)
+from .tasks import schedule_category_counts_refresh
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def invalidate_category_counts_on_link(sender, action, **kwargs):
+    """Product/category links changed, so category counts and cached averages are stale."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_cache_version(CATEGORY_AVERAGES_VERSION_KEY)
+        transaction.on_commit(schedule_category_counts_refresh, robust=True)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_counts(sender, **kwargs):
+    """Deleted products and moved or removed categories change the counts."""
+    transaction.on_commit(schedule_category_counts_refresh, robust=True)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_averages(sender, **kwargs):
+    """
+    A product's price, status or removal moves the averages of its categories;
+    adding or removing a category changes whether it has an average at all.
+    """
+    bump_cache_version(CATEGORY_AVERAGES_VERSION_KEY)
@@ -0,0 +1,52 @@
+import logging
+from celery import shared_task
+from django.core.cache import cache
+from django.db import connection
+from .models import OrderNotification
+from .services import send_pending_notifications
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def send_pending_sms_task():
+    """Drain the SMS outbox; scheduled by Celery beat and routed to the 'sms' queue."""
+    return send_pending_notifications(OrderNotification.Channel.SMS)
+
+
+@shared_task
+def send_pending_emails_task():
+    """Drain the email outbox; scheduled by Celery beat and routed to the 'email' queue."""
+    return send_pending_notifications(OrderNotification.Channel.EMAIL)
+
+
+CATEGORY_COUNTS_REFRESH_KEY = 'catprod:refresh-scheduled'
+CATEGORY_COUNTS_REFRESH_DELAY = 5
+
+
+def schedule_category_counts_refresh():
+    """
+    Queue a refresh of the category_product_counts materialized view.
+
+    Writes within CATEGORY_COUNTS_REFRESH_DELAY seconds of each other share
+    a single refresh. A broker outage is logged rather than raised: the
+    counts only go stale, which must not fail the write that changed them.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    if not cache.add(CATEGORY_COUNTS_REFRESH_KEY, True, CATEGORY_COUNTS_REFRESH_DELAY * 2):
+        return
+    try:
+        refresh_category_product_counts.apply_async(countdown=CATEGORY_COUNTS_REFRESH_DELAY)
+    except Exception:
+        # Clear the flag so the next write tries to queue the refresh again
+        cache.delete(CATEGORY_COUNTS_REFRESH_KEY)
+        logger.exception("Could not queue a category_product_counts refresh")
+
+
+@shared_task
+def refresh_category_product_counts():
+    # Clear the flag first so writes made during the refresh queue another one
+    cache.delete(CATEGORY_COUNTS_REFRESH_KEY)
+    with connection.cursor() as cursor:
+        cursor.execute('REFRESH MATERIALIZED VIEW CONCURRENTLY category_product_counts')
@@ -0,0 +1,68 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import Category, Product
+
+
+class CategoryTreeApiTests(TestCase):
+    """Categories are served as nested trees with cumulative product counts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.electronics = Category.objects.create(name='Electronics')
+        cls.phones = Category.objects.create(name='Phones', parent=cls.electronics)
+        cls.android = Category.objects.create(name='Android', parent=cls.phones)
+        cls.legacy = Category.objects.create(name='Legacy', parent=cls.electronics, is_active=False)
+        cls.books = Category.objects.create(name='Books')
+        products = {
+            name: Product.objects.create(name=name, price=Decimal('10.00'), stock=1)
+            for name in ('Charger', 'Handset', 'Pixel', 'Pager', 'Novel')
+        }
+        products['Charger'].categories.add(cls.electronics)
+        products['Handset'].categories.add(cls.phones)
+        products['Pixel'].categories.add(cls.android)
+        products['Pager'].categories.add(cls.legacy)
+        products['Novel'].categories.add(cls.books)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def list_by_id(self, **params):
+        response = self.client.get('/api/categories/', {'page_size': 100, **params})
+        self.assertEqual(response.status_code, 200)
+        return {row['id']: row for row in response.json()['results']}
+
+    def test_list_nests_active_subcategories(self):
+        rows = self.list_by_id()
+        electronics = rows[str(self.electronics.pk)]
+        self.assertEqual([child['name'] for child in electronics['subcategories']], ['Phones'])
+        phones = electronics['subcategories'][0]
+        self.assertEqual(phones['parent'], str(self.electronics.pk))
+        self.assertEqual([child['name'] for child in phones['subcategories']], ['Android'])
+        self.assertEqual(phones['subcategories'][0]['subcategories'], [])
+        # Inactive categories are hidden from anonymous clients
+        self.assertNotIn(str(self.legacy.pk), rows)
+
+    def test_products_count_is_cumulative(self):
+        rows = self.list_by_id()
+        electronics = rows[str(self.electronics.pk)]
+        # Counts take in every descendant, inactive ones included
+        self.assertEqual(electronics['products_count'], 4)
+        self.assertEqual(rows[str(self.phones.pk)]['products_count'], 2)
+        self.assertEqual(rows[str(self.android.pk)]['products_count'], 1)
+        self.assertEqual(rows[str(self.books.pk)]['products_count'], 1)
+        nested_phones = electronics['subcategories'][0]
+        self.assertEqual(nested_phones['products_count'], 2)
+        self.assertEqual(nested_phones['subcategories'][0]['products_count'], 1)
+
+    def test_list_matches_retrieve(self):
+        rows = self.list_by_id()
+        for category in (self.electronics, self.phones, self.books):
+            response = self.client.get(f'/api/categories/{category.pk}/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), rows[str(category.pk)])
+
+    def test_list_loads_every_tree_in_one_query(self):
+        # One query for the page of ids, one for both trees with their counts
+        with self.assertNumQueries(2):
+            self.list_by_id()
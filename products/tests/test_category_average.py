@@ -0,0 +1,97 @@
+from decimal import Decimal
+from uuid6 import uuid7
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import Category, Product
+
+
+class CategoryAverageCacheTests(TestCase):
+    """Cached category averages are dropped when products or categories change."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        # Custom actions need a staff user; only list and retrieve are public
+        self.client.force_authenticate(get_user_model().objects.create_user(
+            username='staff', email='staff@example.com', password='secret', is_staff=True
+        ))
+        self.category = Category.objects.create(name='Tools')
+        self.hammer = Product.objects.create(name='Hammer', price=Decimal('10.00'), stock=1)
+        self.saw = Product.objects.create(name='Saw', price=Decimal('20.00'), stock=1)
+        self.hammer.categories.add(self.category)
+        self.saw.categories.add(self.category)
+
+    def average(self):
+        response = self.client.get('/api/products/category_average/', {'category_id': str(self.category.pk)})
+        self.assertEqual(response.status_code, 200)
+        return Decimal(str(response.json()['average_price']))
+
+    def test_repeat_request_is_served_from_cache(self):
+        self.assertEqual(self.average(), Decimal('15.00'))
+        # Bypasses signals, so only a cached answer can still be 15
+        Product.objects.filter(pk=self.saw.pk).update(price=Decimal('40.00'))
+        with self.assertNumQueries(0):
+            self.assertEqual(self.average(), Decimal('15.00'))
+
+    def test_price_change_invalidates(self):
+        self.assertEqual(self.average(), Decimal('15.00'))
+        self.saw.price = Decimal('40.00')
+        self.saw.save()
+        self.assertEqual(self.average(), Decimal('25.00'))
+
+    def test_deactivating_product_invalidates(self):
+        self.average()
+        self.saw.is_active = False
+        self.saw.save()
+        self.assertEqual(self.average(), Decimal('10.00'))
+
+    def test_category_link_changes_invalidate(self):
+        self.average()
+        drill = Product.objects.create(name='Drill', price=Decimal('60.00'), stock=1)
+        drill.categories.add(self.category)
+        self.assertEqual(self.average(), Decimal('30.00'))
+        self.category.products.remove(self.hammer)
+        self.assertEqual(self.average(), Decimal('40.00'))
+
+    def test_deleting_product_invalidates(self):
+        self.average()
+        self.hammer.delete()
+        self.assertEqual(self.average(), Decimal('20.00'))
+
+
+class CategoryAverageNotFoundTests(TestCase):
+    """Unknown categories get a 404 from an existence check, not an aggregate."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(
+            username='staff', email='staff@example.com', password='secret', is_staff=True
+        ))
+
+    def get(self, **params):
+        return self.client.get('/api/products/category_average/', params)
+
+    def test_missing_category_id_is_rejected(self):
+        self.assertEqual(self.get().status_code, 400)
+
+    def test_unknown_category_is_not_found(self):
+        self.assertEqual(self.get(category_id=str(uuid7())).status_code, 404)
+
+    def test_malformed_category_id_is_not_found(self):
+        self.assertEqual(self.get(category_id='not-a-uuid').status_code, 404)
+
+    def test_empty_category_has_no_average(self):
+        category = Category.objects.create(name='Empty')
+        response = self.get(category_id=str(category.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'average_price': None})
+
+    def test_deleted_category_is_not_found(self):
+        category = Category.objects.create(name='Gone')
+        self.assertEqual(self.get(category_id=str(category.pk)).status_code, 200)
+        category_id = category.pk
+        category.delete()
+        self.assertEqual(self.get(category_id=str(category_id)).status_code, 404)
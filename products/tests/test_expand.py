@@ -0,0 +1,96 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import Category, Order, OrderItem, Product
+from .utils import create_customer
+
+
+class ProductExpandTests(TestCase):
+    """Product lists leave out categories unless ?expand=category asks for them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.products = []
+        for tree in range(4):
+            root = Category.objects.create(name=f'Root {tree}')
+            child = Category.objects.create(name=f'Child {tree}', parent=root)
+            for number in range(3):
+                product = Product.objects.create(name=f'Product {tree}.{number}', price=Decimal('5.00'), stock=2)
+                product.categories.add(child if number else root)
+                cls.products.append(product)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_list_leaves_out_categories(self):
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('categories', response.json()['results'][0])
+
+    def test_list_expands_categories(self):
+        response = self.client.get('/api/products/', {'expand': 'category', 'page_size': 20})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertEqual(len(results), len(self.products))
+        for row in results:
+            category, = row['categories']
+            self.assertTrue(category['name'].startswith(('Root', 'Child')))
+            if category['name'].startswith('Root'):
+                self.assertEqual([child['name'] for child in category['subcategories']],
+                                 [category['name'].replace('Root', 'Child')])
+                self.assertEqual(category['products_count'], 3)
+
+    def test_expanded_list_builds_category_index_once(self):
+        # Products, their prefetched categories, and one index for all four trees
+        with self.assertNumQueries(3):
+            self.client.get('/api/products/', {'expand': 'category', 'page_size': 20})
+
+    def test_retrieve_includes_categories_without_expand(self):
+        product = self.products[1]
+        response = self.client.get(f'/api/products/{product.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([category['name'] for category in response.json()['categories']], ['Child 0'])
+
+
+class OrderExpandTests(TestCase):
+    """Order lists leave out order_items unless ?expand=items asks for them."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_customer('staff', '+254700000009', is_staff=True).user
+        cls.customer = create_customer()
+        cls.product = Product.objects.create(name='Widget', price=Decimal('2.50'), stock=10)
+        cls.order = Order.objects.create(customer=cls.customer)
+        OrderItem.objects.create(order=cls.order, product=cls.product, quantity=2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def test_list_leaves_out_order_items(self):
+        response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('order_items', response.json()['results'][0])
+
+    def test_list_expands_order_items(self):
+        response = self.client.get('/api/orders/', {'expand': 'items'})
+        self.assertEqual(response.status_code, 200)
+        item, = response.json()['results'][0]['order_items']
+        self.assertEqual(item['product'], 'Widget')
+        self.assertEqual(item['quantity'], 2)
+        self.assertEqual(item['subtotal'], '5.00')
+
+    def test_retrieve_includes_order_items_without_expand(self):
+        response = self.client.get(f'/api/orders/{self.order.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['order_items']), 1)
+
+    def test_create_response_includes_order_items(self):
+        response = self.client.post('/api/orders/', {
+            'customer_id': str(self.customer.pk),
+            'items_data': [{'product_id': str(self.product.pk), 'quantity': 3}],
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        item, = response.json()['order_items']
+        self.assertEqual(item['quantity'], 3)
+        self.assertEqual(response.json()['total_amount'], '7.50')
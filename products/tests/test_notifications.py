@@ -0,0 +1,134 @@
+from datetime import timedelta
+from unittest import mock
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from .. import services
+from ..models import Order, OrderNotification
+from .utils import create_customer
+
+
+class SendPendingNotificationsTests(TestCase):
+    """Outbox rows are claimed, sent and given a per-message status."""
+
+    def setUp(self):
+        self.order = Order.objects.create(customer=create_customer())
+
+    def create_sms(self, recipient='+254700000001', **kwargs):
+        return OrderNotification.objects.create(
+            order=self.order,
+            channel=OrderNotification.Channel.SMS,
+            payload={'message': services.ORDER_SMS_MESSAGE, 'recipient': recipient},
+            **kwargs
+        )
+
+    def send_sms(self, sender):
+        with mock.patch.dict(services.BATCH_SENDERS, {OrderNotification.Channel.SMS: sender}):
+            return services.send_pending_notifications(OrderNotification.Channel.SMS)
+
+    def test_sent_notifications_are_marked_sent(self):
+        notifications = [self.create_sms(), self.create_sms('+254700000002')]
+        sender = mock.Mock(return_value=[])
+        self.assertEqual(self.send_sms(sender), 2)
+        self.assertEqual(
+            {notification.payload['recipient'] for notification in sender.call_args.args[0]},
+            {'+254700000001', '+254700000002'}
+        )
+        for notification in notifications:
+            notification.refresh_from_db()
+            self.assertEqual(notification.status, OrderNotification.Status.SENT)
+            self.assertEqual(notification.attempts, 1)
+
+    def test_failed_notifications_stay_pending_until_retry_delay(self):
+        sent = self.create_sms()
+        failed = self.create_sms('+254700000002')
+        self.send_sms(lambda notifications: [n for n in notifications if n.pk == failed.pk])
+
+        sent.refresh_from_db()
+        failed.refresh_from_db()
+        self.assertEqual(sent.status, OrderNotification.Status.SENT)
+        self.assertEqual(failed.status, OrderNotification.Status.PENDING)
+        self.assertEqual(failed.attempts, 1)
+        self.assertGreater(failed.next_attempt_at, timezone.now())
+        # Not due again until the retry delay has passed
+        self.assertEqual(self.send_sms(mock.Mock(return_value=[])), 0)
+
+    def test_sender_error_leaves_whole_batch_pending(self):
+        notification = self.create_sms()
+        with self.assertLogs('products.services', 'ERROR'):
+            self.assertEqual(self.send_sms(mock.Mock(side_effect=ConnectionError)), 1)
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, OrderNotification.Status.PENDING)
+        self.assertEqual(notification.attempts, 1)
+
+    def test_notification_fails_after_max_attempts(self):
+        notification = self.create_sms(attempts=services.NOTIFICATION_MAX_ATTEMPTS - 1)
+        self.send_sms(lambda notifications: notifications)
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, OrderNotification.Status.FAILED)
+        self.assertEqual(notification.attempts, services.NOTIFICATION_MAX_ATTEMPTS)
+
+    def test_stale_sending_notification_is_reclaimed(self):
+        now = timezone.now()
+        stale = self.create_sms(status=OrderNotification.Status.SENDING, next_attempt_at=now - timedelta(seconds=1))
+        claimed = self.create_sms(status=OrderNotification.Status.SENDING, next_attempt_at=now + timedelta(minutes=5))
+        self.assertEqual(self.send_sms(mock.Mock(return_value=[])), 1)
+        stale.refresh_from_db()
+        claimed.refresh_from_db()
+        self.assertEqual(stale.status, OrderNotification.Status.SENT)
+        self.assertEqual(claimed.status, OrderNotification.Status.SENDING)
+
+    def test_emails_are_sent_and_marked_sent(self):
+        notification = OrderNotification.objects.create(
+            order=self.order,
+            channel=OrderNotification.Channel.EMAIL,
+            payload={
+                'subject': 'New Order', 'message': 'Order details', 'from_email': 'shop@example.com',
+                'recipient_list': ['admin@example.com'],
+            },
+        )
+        self.assertEqual(services.send_pending_notifications(OrderNotification.Channel.EMAIL), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['admin@example.com'])
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, OrderNotification.Status.SENT)
+
+    def test_email_without_recipients_is_retried(self):
+        notification = OrderNotification.objects.create(
+            order=self.order,
+            channel=OrderNotification.Channel.EMAIL,
+            payload={
+                'subject': 'New Order', 'message': 'Order details', 'from_email': 'shop@example.com',
+                'recipient_list': [None],
+            },
+        )
+        with self.assertLogs('products.services', 'ERROR'):
+            services.send_pending_notifications(OrderNotification.Channel.EMAIL)
+        self.assertEqual(len(mail.outbox), 0)
+        notification.refresh_from_db()
+        self.assertEqual(notification.status, OrderNotification.Status.PENDING)
+        self.assertEqual(notification.attempts, 1)
+
+
+class QueueOrderNotificationsTests(TestCase):
+    """queue_order_notifications writes the order's outbox rows."""
+
+    def setUp(self):
+        self.order = Order.objects.create(customer=create_customer())
+
+    @override_settings(ADMIN_EMAIL='admin@example.com', DEFAULT_FROM_EMAIL='shop@example.com')
+    def test_queues_sms_and_admin_email(self):
+        services.queue_order_notifications(self.order)
+        sms = self.order.notifications.get(channel=OrderNotification.Channel.SMS)
+        email = self.order.notifications.get(channel=OrderNotification.Channel.EMAIL)
+        self.assertEqual(sms.payload['recipient'], self.order.customer.phone_number)
+        self.assertEqual(email.payload['recipient_list'], ['admin@example.com'])
+        self.assertEqual(email.payload['from_email'], 'shop@example.com')
+
+    @override_settings(ADMIN_EMAIL='')
+    def test_skips_email_without_admin_address(self):
+        services.queue_order_notifications(self.order)
+        self.assertEqual(
+            list(self.order.notifications.values_list('channel', flat=True)),
+            [OrderNotification.Channel.SMS]
+        )
@@ -0,0 +1,54 @@
+import csv
+import io
+from decimal import Decimal
+from django.http import StreamingHttpResponse
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import Order, OrderItem, Product
+from .utils import create_customer
+
+
+class OrderExportTests(TestCase):
+    """The export action streams every matching order as CSV."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_customer('staff', '+254700000009', is_staff=True).user
+        product = Product.objects.create(name='Widget', price=Decimal('2.50'), stock=10)
+        cls.orders = []
+        for username, phone_number, quantity in [('alice', '+254700000001', 2), ('bob', '+254700000002', 4)]:
+            order = Order.objects.create(customer=create_customer(username, phone_number))
+            OrderItem.objects.create(order=order, product=product, quantity=quantity)
+            cls.orders.append(order)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def export(self, **params):
+        response = self.client.get('/api/orders/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response, StreamingHttpResponse)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="orders.csv"')
+        content = b''.join(response.streaming_content).decode()
+        return list(csv.reader(io.StringIO(content)))
+
+    def test_streams_header_and_rows_newest_first(self):
+        header, *rows = self.export()
+        self.assertEqual(header, ['id', 'customer', 'phone_number', 'status', 'total_amount', 'created_at'])
+        self.assertEqual(
+            [row[:5] for row in rows],
+            [
+                [str(self.orders[1].pk), 'bob', '+254700000002', 'PENDING', '10.00'],
+                [str(self.orders[0].pk), 'alice', '+254700000001', 'PENDING', '5.00'],
+            ]
+        )
+
+    def test_ordering_parameter_applies(self):
+        _, *rows = self.export(ordering='created_at')
+        self.assertEqual([row[1] for row in rows], ['alice', 'bob'])
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(self.orders[0].customer.user)
+        self.assertEqual(self.client.get('/api/orders/export/').status_code, 403)
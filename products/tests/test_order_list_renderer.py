@@ -0,0 +1,62 @@
+import json
+from decimal import Decimal
+from unittest import skipUnless
+from django.db import connection
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from ..models import Order, OrderItem, Product
+from ..serializers import OrderSerializer, optimize_order_queryset
+from ..views import OrderViewSet
+from .utils import create_customer
+
+
+@skipUnless(connection.vendor == 'postgresql', "The SQL order list renderer is PostgreSQL-only")
+class OrderListRendererTests(TestCase):
+    """The SQL-rendered order list matches OrderSerializer field for field."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_customer('staff', '+254700000009', is_staff=True).user
+        widget = Product.objects.create(name='Widget', price=Decimal('2.50'), stock=10)
+        gadget = Product.objects.create(name='Gadget', price=Decimal('4.00'), stock=10)
+        for username, phone_number in [('alice', '+254700000001'), ('bob', '+254700000002')]:
+            customer = create_customer(username, phone_number, first_name=username.title())
+            for quantity in (1, 3):
+                order = Order.objects.create(customer=customer, notes=f'{username} x{quantity}')
+                OrderItem.objects.create(order=order, product=widget, quantity=quantity)
+                OrderItem.objects.create(order=order, product=gadget, quantity=1)
+        Order.objects.create(customer=customer, notes='no items')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+    def serializer_data(self, order_ids, params):
+        """OrderSerializer output for the orders, as the list view would encode it."""
+        request = Request(APIRequestFactory().get('/api/orders/', params))
+        request.user = self.staff
+        view = OrderViewSet(action='list', request=request, format_kwarg=None)
+        orders = {order.pk: order for order in optimize_order_queryset(Order.objects.filter(pk__in=order_ids))}
+        serializer = OrderSerializer(
+            [orders[pk] for pk in order_ids], many=True, context={'request': request, 'view': view}
+        )
+        return json.loads(JSONRenderer().render(serializer.data))
+
+    def assertMatchesSerializer(self, params):
+        response = self.client.get('/api/orders/', params)
+        self.assertEqual(response.status_code, 200)
+        results = json.loads(response.content)['results']
+        self.assertTrue(results)
+        order_ids = [Order._meta.pk.to_python(row['id']) for row in results]
+        self.assertEqual(results, self.serializer_data(order_ids, params))
+        return results
+
+    def test_list_matches_serializer(self):
+        results = self.assertMatchesSerializer({'page_size': 10})
+        self.assertNotIn('order_items', results[0])
+
+    def test_expanded_list_matches_serializer(self):
+        results = self.assertMatchesSerializer({'page_size': 10, 'expand': 'items'})
+        self.assertIn('order_items', results[0])
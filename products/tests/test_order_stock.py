@@ -0,0 +1,41 @@
+from decimal import Decimal
+from django.test import TestCase
+from rest_framework import serializers
+from ..models import Order, OrderItem, Product
+from ..serializers import OrderSerializer
+from .utils import create_customer
+
+
+class OrderSerializerStockTests(TestCase):
+    """OrderSerializer.create checks stock against each product's summed quantity."""
+
+    def setUp(self):
+        self.customer = create_customer()
+        self.product = Product.objects.create(name='Widget', price=Decimal('2.50'), stock=10)
+
+    def order_serializer(self, *quantities):
+        serializer = OrderSerializer(data={
+            'customer_id': str(self.customer.pk),
+            'items_data': [
+                {'product_id': str(self.product.pk), 'quantity': quantity} for quantity in quantities
+            ],
+        })
+        serializer.is_valid(raise_exception=True)
+        return serializer
+
+    def test_rejects_summed_quantity_above_stock(self):
+        # Each line fits the stock on its own; together they don't
+        serializer = self.order_serializer(6, 6)
+        with self.assertRaises(serializers.ValidationError):
+            serializer.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 10)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+
+    def test_decrements_stock_by_summed_quantity(self):
+        order = self.order_serializer(4, 5).save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 1)
+        self.assertEqual(order.order_items.count(), 2)
+        self.assertEqual(order.total_amount, Decimal('22.50'))
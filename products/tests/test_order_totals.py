@@ -0,0 +1,49 @@
+from decimal import Decimal
+from django.test import TestCase
+from ..models import Order, OrderItem, Product
+from .utils import create_customer
+
+
+class OrderTotalTriggerTests(TestCase):
+    """Order.total_amount is kept in step with its items by database triggers."""
+
+    def setUp(self):
+        self.order = Order.objects.create(customer=create_customer())
+        self.widget = Product.objects.create(name='Widget', price=Decimal('2.50'), stock=10)
+        self.gadget = Product.objects.create(name='Gadget', price=Decimal('4.00'), stock=10)
+
+    def assertTotal(self, expected):
+        self.order.refresh_from_db(fields=['total_amount'])
+        self.assertEqual(self.order.total_amount, Decimal(expected))
+
+    def test_insert_adds_item_subtotal(self):
+        OrderItem.objects.create(order=self.order, product=self.widget, quantity=2)
+        self.assertTotal('5.00')
+        OrderItem.objects.bulk_create([
+            OrderItem(order=self.order, product=self.gadget, quantity=1, price_at_time=self.gadget.price)
+        ])
+        self.assertTotal('9.00')
+
+    def test_update_recomputes_total(self):
+        item = OrderItem.objects.create(order=self.order, product=self.widget, quantity=2)
+        item.quantity = 3
+        item.save()
+        self.assertTotal('7.50')
+        OrderItem.objects.filter(pk=item.pk).update(price_at_time=Decimal('1.00'))
+        self.assertTotal('3.00')
+
+    def test_update_moving_item_recomputes_both_orders(self):
+        item = OrderItem.objects.create(order=self.order, product=self.widget, quantity=2)
+        other = Order.objects.create(customer=self.order.customer)
+        OrderItem.objects.filter(pk=item.pk).update(order=other)
+        self.assertTotal('0.00')
+        other.refresh_from_db(fields=['total_amount'])
+        self.assertEqual(other.total_amount, Decimal('5.00'))
+
+    def test_delete_subtracts_item_subtotal(self):
+        item = OrderItem.objects.create(order=self.order, product=self.widget, quantity=2)
+        OrderItem.objects.create(order=self.order, product=self.gadget, quantity=1)
+        item.delete()
+        self.assertTotal('4.00')
+        self.order.order_items.all().delete()
+        self.assertTotal('0.00')
@@ -0,0 +1,54 @@
+from decimal import Decimal
+from uuid6 import uuid7
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+from ..models import Product
+
+
+class UpdateStockTests(TestCase):
+    """update_stock sets a product's stock with one UPDATE and no read."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(
+            username='staff', email='staff@example.com', password='secret', is_staff=True
+        ))
+        self.product = Product.objects.create(name='Widget', price=Decimal('2.50'), stock=10)
+
+    def update_stock(self, pk, stock):
+        return self.client.post(f'/api/products/{pk}/update_stock/', {'stock': stock}, format='json')
+
+    def test_sets_stock(self):
+        updated_at = self.product.updated_at
+        with self.assertNumQueries(1):
+            response = self.update_stock(self.product.pk, 3)
+        self.assertEqual(response.status_code, 200)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 3)
+        self.assertGreater(self.product.updated_at, updated_at)
+
+    def test_missing_product_is_not_found(self):
+        self.assertEqual(self.update_stock(uuid7(), 3).status_code, 404)
+
+    def test_malformed_product_id_is_not_found(self):
+        self.assertEqual(self.update_stock('not-a-uuid', 3).status_code, 404)
+
+    def test_rejects_negative_stock(self):
+        response = self.update_stock(self.product.pk, -1)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('stock', response.json())
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 10)
+
+    def test_rejects_non_integer_stock(self):
+        for stock in ('many', 2.5):
+            self.assertEqual(self.update_stock(self.product.pk, stock).status_code, 400)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 10)
+
+    def test_requires_staff(self):
+        self.client.force_authenticate(get_user_model().objects.create_user(
+            username='shopper', email='shopper@example.com', password='secret'
+        ))
+        self.assertEqual(self.update_stock(self.product.pk, 3).status_code, 403)
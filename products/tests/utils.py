@@ -0,0 +1,12 @@
+from django.contrib.auth import get_user_model
+from ..models import Customer
+
+User = get_user_model()
+
+
+def create_customer(username='buyer', phone_number='+254700000001', **user_fields):
+    """Create a user and their customer profile."""
+    user = User.objects.create_user(
+        username=username, email=f'{username}@example.com', password='secret', **user_fields
+    )
+    return Customer.objects.create(user=user, phone_number=phone_number)
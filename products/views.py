@@ -1,38 +1,65 @@
-from typing import Any, List
+from typing import Any
+import csv
 import logging
-from django.db.models import Avg, QuerySet
-from django.conf import settings
-from django.core.mail import send_mail
+from itertools import chain
+from django.db import transaction
+from django.db.models import Avg, Prefetch, QuerySet
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
-from rest_framework.pagination import PageNumberPagination
-import africastalking
-from drf_spectacular.utils import extend_schema
-from .models import Category, Customer, Product, Order, OrderItem
+from rest_framework.pagination import CursorPagination
+from drf_spectacular.utils import OpenApiParameter, extend_schema, extend_schema_view
+from .models import (
+    CATEGORY_AVERAGE_TTL, Category, Customer, Product, Order, OrderItem, category_average_key
+)
 from .serializers import (
-    CategorySerializer, CustomerSerializer, ProductSerializer,
-    OrderSerializer, OrderItemSerializer, StockUpdateSerializer
+    CategorySerializer, CustomerSerializer, ProductSerializer, ProductListSerializer,
+    OrderSerializer, StockUpdateSerializer,
+    optimize_customer_queryset, optimize_order_queryset, projected_fields, requested_expansions
 )
-from .services import send_order_sms, send_admin_email
+from .services import queue_order_notifications
+from . import pg_serializers
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
-class StandardResultsSetPagination(PageNumberPagination):
+class _Echo:
+    """File-like object whose write() returns the line, for streaming csv.writer output."""
+
+    def write(self, value: str) -> str:
+        return value
+
+class StandardResultsSetPagination(CursorPagination):
+    """Keyset pagination: no COUNT(*) per page, and deep pages stay cheap."""
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    # id breaks ties between rows created in the same instant, and with it
+    # the (created_at, id) indexes serve the whole ORDER BY
+    ordering = ('-created_at', '-id')
 
 class BaseViewSet(viewsets.ModelViewSet):
     pagination_class = StandardResultsSetPagination
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    # Cursor pagination takes its ordering from OrderingFilter, which needs a default
+    ordering = ['-created_at', '-id']
+    # Permission instances are stateless, so one shared set serves every request
+    _PERMS_READ = ()
+    _PERMS_WRITE = (IsAdminUser(),)
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
-            return []
-        return [IsAdminUser()]
+        if self.action in ('list', 'retrieve'):
+            return self._PERMS_READ
+        return self._PERMS_WRITE
+
+    def is_expanded(self, name: str) -> bool:
+        """Whether a gated nested field is serialized: always, except on lists without ?expand=name."""
+        return self.action != 'list' or name in requested_expansions(self.request)
 
 class CategoryViewSet(BaseViewSet):
     queryset = Category.objects.all()
@@ -46,29 +73,70 @@ class CategoryViewSet(BaseViewSet):
             queryset = queryset.filter(is_active=True)
         return queryset
 
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Response:
+        # Rows are plain dicts end to end; no Category instances are built.
+        # The cursor is read from the ordering fields, so they must be in the rows.
+        rows = self.filter_queryset(self.get_queryset()).values('id', 'tree_id', *self.ordering_fields)
+        page = self.paginate_queryset(rows)
+        data = self.get_serializer().represent_rows(rows if page is None else page)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
+
+@extend_schema_view(list=extend_schema(parameters=[OpenApiParameter(
+    'expand', str,
+    description="Comma-separated nested fields to include; 'category' adds each product's categories."
+)]))
 class ProductViewSet(BaseViewSet):
-    queryset = Product.objects.select_related('category').all()
+    queryset = Product.objects.all()
     serializer_class = ProductSerializer
     search_fields = ['name', 'description']
     ordering_fields = ['name', 'price', 'created_at']
 
+    def get_serializer_class(self):
+        # The flat list serializer has no categories to expand
+        if self.action == 'list' and not self.is_expanded('category'):
+            return ProductListSerializer
+        return super().get_serializer_class()
+
     def get_queryset(self) -> QuerySet:
         queryset = super().get_queryset()
         if not self.request.user.is_staff:
             queryset = queryset.filter(is_active=True)
         category_id = self.request.query_params.get('category_id')
         if category_id:
-            queryset = queryset.filter(category_id=category_id)
+            try:
+                category_id = Category._meta.pk.to_python(category_id)
+            except DjangoValidationError:
+                # Not a category id, so no product can match it
+                queryset = queryset.none()
+            else:
+                # A single join on the categories table's category_id; each
+                # (product, category) pair is unique, so no distinct() is needed
+                queryset = queryset.filter(categories=category_id)
+        if self.is_expanded('category'):
+            queryset = queryset.prefetch_related('categories')
+        elif self.action == 'list':
+            # ProductListSerializer never reads description or categories
+            queryset = queryset.only(*projected_fields(ProductListSerializer))
         return queryset
 
     @action(detail=True, methods=['post'], permission_classes=[IsAdminUser])
     @extend_schema(request=StockUpdateSerializer, responses={200: "Stock updated successfully"})
     def update_stock(self, request: Any, pk: None = None) -> Response:
-        product = self.get_object()
         serializer = StockUpdateSerializer(data=request.data)
         if serializer.is_valid():
-            product.stock = serializer.validated_data['stock']
-            product.save()
+            # One UPDATE with no read first, so it can't overwrite a concurrent
+            # order's decrement. Relative changes must stay in SQL as well:
+            # Product.objects.filter(pk=pk).update(stock=F('stock') - quantity)
+            try:
+                updated = Product.objects.filter(pk=pk).update(
+                    stock=serializer.validated_data['stock'], updated_at=timezone.now()
+                )
+            except (TypeError, ValueError, DjangoValidationError):
+                updated = 0
+            if not updated:
+                raise Http404
             return Response({'status': 'Stock updated successfully'})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -77,7 +145,20 @@ class ProductViewSet(BaseViewSet):
         category_id = request.query_params.get('category_id')
         if not category_id:
             return Response({'error': 'Category ID required'}, status=status.HTTP_400_BAD_REQUEST)
-        avg_price = Product.objects.filter(category_id=category_id, is_active=True).aggregate(average_price=Avg('price'))
+        try:
+            category_id = Category._meta.pk.to_python(category_id)
+        except DjangoValidationError:
+            return Response({'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        def average_price():
+            # An unknown id is an index-only existence check, not a full aggregate
+            if not Category.objects.filter(pk=category_id).exists():
+                return None
+            return Product.objects.filter(categories=category_id, is_active=True).aggregate(average_price=Avg('price'))
+
+        avg_price = cache.get_or_set(category_average_key(category_id), average_price, CATEGORY_AVERAGE_TTL)
+        if avg_price is None:
+            return Response({'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
         return Response(avg_price)
 
 class CustomerViewSet(BaseViewSet):
@@ -88,46 +169,65 @@ class CustomerViewSet(BaseViewSet):
     ordering_fields = ['created_at']
 
     def get_queryset(self) -> QuerySet:
-        if self.request.user.is_staff:
-            return Customer.objects.all()
-        return Customer.objects.filter(user=self.request.user)
-
+        queryset = optimize_customer_queryset(Customer.objects.all())
+        if self.action == 'list':
+            queryset = queryset.only(*projected_fields(CustomerSerializer))
+        return queryset if self.request.user.is_staff else queryset.filter(user_id=self.request.user.id)
+
+@extend_schema_view(list=extend_schema(parameters=[OpenApiParameter(
+    'expand', str,
+    description="Comma-separated nested fields to include; 'items' adds each order's order_items."
+)]))
 class OrderViewSet(BaseViewSet):
-    queryset = Order.objects.prefetch_related('order_items').all()
+    queryset = Order.objects.select_related('customer__user').prefetch_related(
+        Prefetch('order_items', queryset=OrderItem.objects.select_related('product'))
+    ).all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated]
     ordering_fields = ['created_at', 'status']
     pagination_class = StandardResultsSetPagination
 
     def get_queryset(self) -> QuerySet:
-        if self.request.user.is_staff:
-            return Order.objects.all()
-        return Order.objects.filter(customer__user=self.request.user)
-
-    def perform_create(self, serializer: OrderSerializer) -> None:
-        order = serializer.save()
-        self._send_order_notifications(order)
-
-    def _send_order_notifications(self, order: Order) -> None:
-        """Calls services.py functions to send notifications"""
-        send_order_sms(order)
-        send_admin_email(order)
-        logger.info(f"Order {order.id} processed successfully")
-        
-    def _format_order_email(self, order: Order) -> str:
-        items = OrderItem.objects.filter(order=order)
-        items_text = "\n".join(
-            f"- {item.quantity}x {item.product.name} @ ${item.price_at_time}" for item in items
+        # Staff and customers share the same joins and prefetches; customers
+        # only add a filter on the customer's user_id column
+        queryset = optimize_order_queryset(Order.objects.all(), items=self.is_expanded('items'))
+        return queryset if self.request.user.is_staff else queryset.filter(customer__user_id=self.request.user.id)
+
+    def list(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        if not pg_serializers.is_supported():
+            return super().list(request, *args, **kwargs)
+        # Only the page of ids comes through the ORM; PostgreSQL builds the JSON
+        queryset = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        # The cursor is read from the ordering fields, so they must be in the rows
+        rows = queryset.values('id', *self.ordering_fields)
+        page = self.paginate_queryset(rows)
+        content = pg_serializers.render_orders(
+            [row['id'] for row in (rows if page is None else page)],
+            items=self.is_expanded('items')
         )
-        return f"""
-        New Order Received
-
-        Order ID: {order.id}
-        Customer: {order.customer.user.get_full_name() or order.customer.user.username}
-        Phone: {order.customer.phone_number}
+        if page is not None:
+            content = pg_serializers.paginated_json(self.paginator, content)
+        return HttpResponse(content, content_type='application/json')
 
-        Items:
-        {items_text}
+    @extend_schema(responses={(200, 'text/csv'): str})
+    @action(detail=False, methods=['get'])
+    def export(self, request: Any) -> StreamingHttpResponse:
+        """Stream every matching order as CSV without holding them all in memory."""
+        rows = self.filter_queryset(self.get_queryset()).prefetch_related(None).values_list(
+            'id', 'customer__user__username', 'customer__phone_number',
+            'status', 'total_amount', 'created_at'
+        )
+        writer = csv.writer(_Echo())
+        header = ['id', 'customer', 'phone_number', 'status', 'total_amount', 'created_at']
+        lines = chain([writer.writerow(header)], (writer.writerow(row) for row in rows.iterator(chunk_size=2000)))
+        response = StreamingHttpResponse(lines, content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="orders.csv"'
+        return response
 
-        Total Amount: ${order.total_amount}
-        """
+    def perform_create(self, serializer: OrderSerializer) -> None:
+        # Notifications are written to the outbox with the order and sent in
+        # batches by the Celery beat tasks
+        with transaction.atomic():
+            order = serializer.save()
+            queue_order_notifications(order)
+        logger.info("Order %s processed successfully", order.id)